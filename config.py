@@ -1,5 +1,8 @@
 import os
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -28,13 +31,30 @@ REPORTS_DIR.mkdir(exist_ok=True)
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
+# Handlers do synchronous I/O; routed through a queue they run on a
+# dedicated listener thread instead of blocking the event loop mid-handler
+_log_formatter = logging.Formatter(LOG_FORMAT)
+_log_handlers = [
+    logging.FileHandler(PROJECT_ROOT / 'bot.log'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# QueueHandler.prepare() pre-formats the record before enqueueing; keep
+# that to the bare message so the listener's handlers apply LOG_FORMAT
+# exactly once
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL),
-    format=LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(PROJECT_ROOT / 'bot.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[_queue_handler]
 )
 
 logger = logging.getLogger(__name__)
@@ -44,6 +64,25 @@ MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
 SUPPORTED_FORMATS = ['jpg', 'jpeg', 'png', 'gif', 'pdf']
 ANALYSIS_TIMEOUT = 120  # seconds
 
+# Webhook mode: when WEBHOOK_URL is set, Telegram pushes updates to us
+# instead of the bot long-polling getUpdates
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # e.g. https://bot.example.com/telegram
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8443))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', 'telegram')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')  # optional X-Telegram-Bot-Api-Secret-Token
+
+# Cap on photo pipelines running at once; each holds a decoded image and
+# a DataFrame in memory, so this bounds peak RSS
+MAX_CONCURRENT_PHOTOS = int(os.getenv('MAX_CONCURRENT_PHOTOS', min(4, os.cpu_count() or 1)))
+
+# Keep generated reports on disk under data/reports; when off, reports
+# are built in memory and only uploaded to Telegram
+PERSIST_REPORTS = os.getenv('PERSIST_REPORTS', 'false').lower() in ('1', 'true', 'yes')
+
+# Keep a copy of incoming photos on disk (debugging aid); the hot path
+# processes downloads entirely in memory
+PERSIST_UPLOADS = os.getenv('PERSIST_UPLOADS', 'false').lower() in ('1', 'true', 'yes')
+
 # OCR Configuration
 OCR_LANGUAGES = ['en']
 OCR_GPU = False  # Set to True if GPU available
@@ -0,0 +1,33 @@
+"""Shared pytest fixtures for the test scripts
+
+Session scope so one DataAnalyzer / ExcelReportGenerator / ImageProcessor
+serves the whole run — constructing these repeatedly re-pays style
+registration and (for OCR) model loading.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+@pytest.fixture(scope="session")
+def analyzer():
+    from src.data_analyzer import DataAnalyzer
+    return DataAnalyzer()
+
+
+@pytest.fixture(scope="session")
+def excel_generator():
+    from src.excel_generator import ExcelReportGenerator
+    return ExcelReportGenerator()
+
+
+@pytest.fixture(scope="session")
+def image_processor():
+    pytest.importorskip("cv2")
+    pytest.importorskip("easyocr")
+    from src.image_processor import ImageProcessor
+    return ImageProcessor()
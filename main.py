@@ -8,6 +8,14 @@ import asyncio
 import logging
 import sys
 
+try:
+    # Drop-in libuv event loop: 2-4x asyncio throughput, which is the
+    # critical path for Telegram long-polling under load
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 import config
 from src.agent import create_agent
 
@@ -28,7 +28,11 @@ class DataAnalystAgent:
             config.DATA_DIR.mkdir(exist_ok=True)
             config.UPLOADS_DIR.mkdir(exist_ok=True)
             config.REPORTS_DIR.mkdir(exist_ok=True)
-            
+
+            # Pre-load OCR models at boot so the first upload doesn't pay
+            # the model-initialization cost
+            _ = self.bot.image_processor.reader
+
             self.logger.info("Agent initialized successfully")
             return True
             
@@ -1,13 +1,46 @@
+import json
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional
 from sklearn.preprocessing import StandardScaler
 
+try:
+    # C-level JSON encoder with native numpy support, 3-10x faster than
+    # the stdlib for the numeric-heavy analysis dicts
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Only downcast the numeric working copy when it's big enough for the
+# halved memory bandwidth to outweigh the cast cost
+DOWNCAST_THRESHOLD_BYTES = 32 * 1024 ** 2
+
+# Above this row count, estimate object-column memory from a sample instead
+# of the per-cell deep scan
+DEEP_MEMORY_ROW_THRESHOLD = 100_000
+
+# Cap on outlier values reported per column; counts stay exact
+MAX_OUTLIER_SAMPLES = 50
+
 
 class DataAnalyzer:
+    # Business-metric keyword buckets: one compiled alternation classifies a
+    # column name in a single scan instead of five separate substring sweeps
+    KEYWORD_BUCKETS = {
+        'revenue': 'revenue', 'sales': 'revenue', 'income': 'revenue',
+        'cost': 'cost', 'expense': 'cost', 'spend': 'cost',
+        'customer': 'customer', 'user': 'customer', 'client': 'customer',
+        'order': 'order', 'transaction': 'order', 'purchase': 'order',
+        'value': 'value', 'price': 'value', 'avg': 'value', 'average': 'value',
+    }
+    KEYWORD_PATTERN = re.compile('|'.join(re.escape(k) for k in KEYWORD_BUCKETS))
+
     def __init__(self):
         self.logger = logger
         self.analysis_results = {}
@@ -28,17 +61,43 @@ class DataAnalyzer:
                 return {'error': 'No data to analyze'}
             
             self.logger.info(f"Starting analysis on {df.shape[0]} rows, {df.shape[1]} columns")
-            
-            # Run analyses
-            self.analysis_results = {
-                'overview': self._analyze_overview(df),
-                'descriptive_stats': self._analyze_descriptive_stats(df),
-                'data_quality': self._analyze_data_quality(df),
-                'correlations': self._analyze_correlations(df),
-                'outliers': self._detect_outliers(df),
-                'trends': self._detect_trends(df),
-                'insights': self._generate_insights(df),
+
+            # Precompute shared scans once: isnull/duplicated are O(rows x cols)
+            # and were previously recomputed by several helpers
+            null_sum = df.isnull().sum()
+            dup_count = int(df.duplicated().sum())
+
+            # Analysis-only numeric working copy; downcast large float64 frames
+            # to float32 to halve the bytes moved by the numeric passes
+            # (overview/data-quality keep the original df for true dtypes/memory)
+            numeric_df = df.select_dtypes(include=[np.number])
+            if numeric_df.memory_usage(deep=False).sum() > DOWNCAST_THRESHOLD_BYTES:
+                numeric_df = numeric_df.astype(np.float32)
+
+            # Dtype selections are also shared — each select_dtypes call scans
+            # every column dtype and builds a new frame
+            dtype_counts = {
+                'numeric': numeric_df.shape[1],
+                'categorical': df.select_dtypes(include=['object']).shape[1],
+                'datetime': df.select_dtypes(include=['datetime64']).shape[1],
             }
+            numeric_cols = numeric_df.columns.tolist()
+
+            # Run independent analyses concurrently — the pandas/numpy kernels
+            # release the GIL, so the passes overlap on multiple cores.
+            # Only insights depends on another result (trends)
+            with ThreadPoolExecutor(max_workers=min(6, os.cpu_count() or 1)) as executor:
+                futures = {
+                    'overview': executor.submit(self._analyze_overview, df),
+                    'descriptive_stats': executor.submit(self._analyze_descriptive_stats, numeric_df),
+                    'data_quality': executor.submit(self._analyze_data_quality, df, null_sum, dup_count, dtype_counts),
+                    'correlations': executor.submit(self._analyze_correlations, numeric_df),
+                    'outliers': executor.submit(self._detect_outliers, numeric_df),
+                    'trends': executor.submit(self._detect_trends, numeric_df),
+                }
+                trends = futures['trends'].result()
+                futures['insights'] = executor.submit(self._generate_insights, df, null_sum, trends, numeric_cols)
+                self.analysis_results = {name: future.result() for name, future in futures.items()}
             
             return self.analysis_results
             
@@ -46,6 +105,16 @@ class DataAnalyzer:
             self.logger.error(f"Error analyzing data: {e}", exc_info=True)
             return {'error': str(e)}
 
+    def to_json_bytes(self) -> bytes:
+        """Serialize the latest analysis results to JSON bytes"""
+        if orjson is not None:
+            return orjson.dumps(
+                self.analysis_results,
+                default=str,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+        return json.dumps(self.analysis_results, default=str).encode('utf-8')
+
     def _analyze_overview(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Basic overview of the dataset"""
         return {
@@ -53,140 +122,187 @@ class DataAnalyzer:
             'total_columns': len(df.columns),
             'column_names': list(df.columns),
             'column_types': dict(df.dtypes),
-            'memory_usage_mb': df.memory_usage(deep=True).sum() / 1024**2,
+            'memory_usage_mb': self._estimate_memory_usage(df) / 1024**2,
         }
 
-    def _analyze_descriptive_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _estimate_memory_usage(self, df: pd.DataFrame) -> float:
+        """Memory usage in bytes; deep=True walks every object cell, so large
+        frames get a shallow scan plus a sampled estimate for string columns"""
+        if len(df) <= DEEP_MEMORY_ROW_THRESHOLD:
+            return float(df.memory_usage(deep=True).sum())
+
+        memory_bytes = float(df.memory_usage(deep=False).sum())
+        for col in df.select_dtypes(include=['object']).columns:
+            avg_len = df[col].head(1000).astype(str).str.len().mean()
+            if pd.notna(avg_len):
+                memory_bytes += len(df) * avg_len * 8
+        return memory_bytes
+
+    def _analyze_descriptive_stats(self, numeric_df: pd.DataFrame) -> Dict[str, Any]:
         """Calculate descriptive statistics"""
-        numeric_df = df.select_dtypes(include=[np.number])
-        
         if numeric_df.empty:
             return {'note': 'No numeric columns found'}
         
+        # Vectorized: describe() computes all base stats in a few passes over
+        # the whole matrix instead of ~9 pandas calls per column
+        desc = numeric_df.describe(percentiles=[.25, .5, .75]).T
+        skewness = numeric_df.skew()
+        kurtosis = numeric_df.kurtosis()
+
         stats = {}
-        for col in numeric_df.columns:
+        for col in desc.index:
             stats[col] = {
-                'mean': float(numeric_df[col].mean()),
-                'median': float(numeric_df[col].median()),
-                'std': float(numeric_df[col].std()),
-                'min': float(numeric_df[col].min()),
-                'max': float(numeric_df[col].max()),
-                'q25': float(numeric_df[col].quantile(0.25)),
-                'q75': float(numeric_df[col].quantile(0.75)),
-                'skewness': float(numeric_df[col].skew()),
-                'kurtosis': float(numeric_df[col].kurtosis()),
+                'mean': float(desc.loc[col, 'mean']),
+                'median': float(desc.loc[col, '50%']),
+                'std': float(desc.loc[col, 'std']),
+                'min': float(desc.loc[col, 'min']),
+                'max': float(desc.loc[col, 'max']),
+                'q25': float(desc.loc[col, '25%']),
+                'q75': float(desc.loc[col, '75%']),
+                'skewness': float(skewness[col]),
+                'kurtosis': float(kurtosis[col]),
             }
-        
+
         return stats
 
-    def _analyze_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_data_quality(self, df: pd.DataFrame, null_sum: pd.Series, dup_count: int,
+                              dtype_counts: Dict[str, int]) -> Dict[str, Any]:
         """Analyze data quality issues"""
+        # Bulk tolist() converts to Python scalars at the C level instead of
+        # Series.to_dict() boxing one value at a time
+        cols = null_sum.index.tolist()
         quality = {
-            'missing_values': df.isnull().sum().to_dict(),
-            'missing_percentage': (df.isnull().sum() / len(df) * 100).to_dict(),
-            'duplicate_rows': len(df[df.duplicated()]),
-            'duplicate_percentage': len(df[df.duplicated()]) / len(df) * 100,
-        }
-        
-        # Data type analysis
-        quality['data_types'] = {
-            'numeric': len(df.select_dtypes(include=[np.number]).columns),
-            'categorical': len(df.select_dtypes(include=['object']).columns),
-            'datetime': len(df.select_dtypes(include=['datetime64']).columns),
+            'missing_values': dict(zip(cols, null_sum.values.tolist())),
+            'missing_percentage': dict(zip(cols, (null_sum.values / max(len(df), 1) * 100).tolist())),
+            'duplicate_rows': dup_count,
+            'duplicate_percentage': dup_count / len(df) * 100,
         }
-        
+
+        # Data type analysis (counts precomputed in analyze_data)
+        quality['data_types'] = dtype_counts
+
         return quality
 
-    def _analyze_correlations(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_correlations(self, numeric_df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze correlations between columns"""
-        numeric_df = df.select_dtypes(include=[np.number])
-        
         if numeric_df.shape[1] < 2:
             return {'note': 'Not enough numeric columns for correlation'}
         
         try:
-            corr_matrix = numeric_df.corr()
-            
-            # Find strong correlations (> 0.7)
-            strong_corr = {}
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i+1, len(corr_matrix.columns)):
-                    col1, col2 = corr_matrix.columns[i], corr_matrix.columns[j]
-                    corr_val = corr_matrix.iloc[i, j]
-                    if abs(corr_val) > 0.7:
-                        strong_corr[f"{col1} <-> {col2}"] = float(corr_val)
+            # NaN-free frames can skip pandas' per-pair NaN handling and use
+            # the single BLAS-backed np.corrcoef call; fall back otherwise
+            values = numeric_df.to_numpy(dtype=np.float64)
+            if not np.isnan(values).any():
+                corr_matrix = pd.DataFrame(
+                    np.corrcoef(np.ascontiguousarray(values.T)),
+                    index=numeric_df.columns, columns=numeric_df.columns,
+                )
+            else:
+                corr_matrix = numeric_df.corr()
+
+            # Find strong correlations (> 0.7) — gather the upper triangle in
+            # one numpy pass instead of k^2 pandas .iloc lookups
+            arr = corr_matrix.to_numpy()
+            iu, ju = np.triu_indices(arr.shape[0], 1)
+            vals = arr[iu, ju]
+            strong = np.abs(vals) > 0.7
+
+            cols = corr_matrix.columns.to_numpy()
+            strong_corr = {
+                f"{cols[i]} <-> {cols[j]}": float(v)
+                for i, j, v in zip(iu[strong], ju[strong], vals[strong])
+            }
             
             return {
-                'correlation_matrix': corr_matrix.to_dict(),
+                # flat row-per-column lists: to_dict() would allocate k^2
+                # nested dict entries plus a PyFloat per cell
+                'correlation_columns': list(corr_matrix.columns),
+                'correlation_matrix': {col: arr[i].tolist() for i, col in enumerate(corr_matrix.columns)},
                 'strong_correlations': strong_corr,
             }
         except Exception as e:
             self.logger.debug(f"Correlation analysis failed: {e}")
             return {'error': str(e)}
 
-    def _detect_outliers(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _detect_outliers(self, numeric_df: pd.DataFrame) -> Dict[str, Any]:
         """Detect outliers using IQR method"""
-        numeric_df = df.select_dtypes(include=[np.number])
-        
+        if numeric_df.empty:
+            return {'note': 'No outliers detected'}
+
+        # Vectorized IQR: one quantile call and one comparison over the whole
+        # matrix instead of two quantile sorts + mask per column
+        arr = numeric_df.to_numpy(dtype=np.float64, copy=False)
+        q1, q3 = np.nanquantile(arr, [0.25, 0.75], axis=0)
+        iqr = q3 - q1
+        lower_bound = q1 - 1.5 * iqr
+        upper_bound = q3 + 1.5 * iqr
+
+        mask = (arr < lower_bound) | (arr > upper_bound)
+        counts = mask.sum(axis=0)
+
         outliers = {}
-        for col in numeric_df.columns:
-            Q1 = numeric_df[col].quantile(0.25)
-            Q3 = numeric_df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outlier_mask = (numeric_df[col] < lower_bound) | (numeric_df[col] > upper_bound)
-            outlier_count = outlier_mask.sum()
-            
-            if outlier_count > 0:
+        for idx, col in enumerate(numeric_df.columns):
+            if counts[idx] > 0:
+                # Sample the values — a heavy-tailed column could otherwise
+                # materialize a list the size of the whole column
+                values = arr[mask[:, idx], idx][:MAX_OUTLIER_SAMPLES].tolist()
                 outliers[col] = {
-                    'count': int(outlier_count),
-                    'percentage': float(outlier_count / len(df) * 100),
-                    'values': numeric_df.loc[outlier_mask, col].tolist(),
+                    'count': int(counts[idx]),
+                    'percentage': float(counts[idx] / len(numeric_df) * 100),
+                    'values': values,
+                    'truncated': bool(counts[idx] > MAX_OUTLIER_SAMPLES),
                 }
-        
+
         return outliers if outliers else {'note': 'No outliers detected'}
 
-    def _detect_trends(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _detect_trends(self, numeric_df: pd.DataFrame) -> Dict[str, Any]:
         """Detect trends in numeric columns"""
-        numeric_df = df.select_dtypes(include=[np.number])
-        
+        if numeric_df.empty:
+            return {'note': 'No trends detected'}
+
+        # Simple trend: compare first half vs second half. Two matrix-level
+        # reductions instead of two Series passes per column
+        mid = len(numeric_df) // 2
+        first = numeric_df.iloc[:mid].mean(axis=0)
+        second = numeric_df.iloc[mid:].mean(axis=0)
+
         trends = {}
         for col in numeric_df.columns:
-            # Simple trend: compare first half vs second half
-            mid = len(numeric_df) // 2
-            first_half_mean = numeric_df[col][:mid].mean()
-            second_half_mean = numeric_df[col][mid:].mean()
-            
+            first_half_mean = first[col]
+            second_half_mean = second[col]
+
             change = second_half_mean - first_half_mean
             change_percent = (change / first_half_mean * 100) if first_half_mean != 0 else 0
-            
+
             trend = 'increasing' if change > 0 else 'decreasing'
-            
+
             trends[col] = {
                 'trend': trend,
                 'change_percentage': float(change_percent),
                 'first_half_avg': float(first_half_mean),
                 'second_half_avg': float(second_half_mean),
             }
-        
+
         return trends if trends else {'note': 'No trends detected'}
 
-    def _generate_insights(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _generate_insights(self, df: pd.DataFrame, null_sum: pd.Series, trends: Dict[str, Any],
+                           numeric_cols: list) -> Dict[str, Any]:
         """Generate business-focused actionable insights like a human analyst"""
         insights = []
-        
-        # Get trends for business analysis
-        trends = self._detect_trends(df)
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        # Identify business metrics by common naming patterns
-        revenue_cols = [c for c in numeric_cols if any(x in c.lower() for x in ['revenue', 'sales', 'income'])]
-        cost_cols = [c for c in numeric_cols if any(x in c.lower() for x in ['cost', 'expense', 'spend'])]
-        customer_cols = [c for c in numeric_cols if any(x in c.lower() for x in ['customer', 'user', 'client'])]
-        order_cols = [c for c in numeric_cols if any(x in c.lower() for x in ['order', 'transaction', 'purchase'])]
-        value_cols = [c for c in numeric_cols if any(x in c.lower() for x in ['value', 'price', 'avg', 'average'])]
+
+        # Identify business metrics by common naming patterns — single regex
+        # pass per column name, bucketed via KEYWORD_BUCKETS
+        buckets = {'revenue': [], 'cost': [], 'customer': [], 'order': [], 'value': []}
+        for c in numeric_cols:
+            matched = {self.KEYWORD_BUCKETS[m] for m in self.KEYWORD_PATTERN.findall(c.lower())}
+            for bucket in matched:
+                buckets[bucket].append(c)
+
+        revenue_cols = buckets['revenue']
+        cost_cols = buckets['cost']
+        customer_cols = buckets['customer']
+        order_cols = buckets['order']
+        value_cols = buckets['value']
         
         # BUSINESS INSIGHT 1: Revenue performance
         if revenue_cols and isinstance(trends.get(revenue_cols[0]), dict):
@@ -256,7 +372,7 @@ class DataAnalyzer:
                     )
         
         # DATA QUALITY INSIGHTS (brief, business-focused)
-        missing_pct = df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100
+        missing_pct = null_sum.sum() / (len(df) * len(df.columns)) * 100
         if missing_pct > 10:
             insights.append(
                 f"⚠️ Data completeness issue: {missing_pct:.1f}% missing values may affect analysis accuracy. "
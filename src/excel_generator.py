@@ -1,251 +1,417 @@
+import functools
 import logging
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from pathlib import Path
 from typing import Dict, Any, Optional
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
+try:
+    # Optional engine: constant_memory mode keeps only the current row in
+    # RAM, which openpyxl can't match even in write-only mode
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1024)
+def _col_letter(col_num: int) -> str:
+    """Cached column-index -> letter conversion"""
+    return get_column_letter(col_num)
+
+
+def _set_column_widths(ws, widths: Dict[str, int]):
+    """Batch column-width assignment (write-only sheets require this before
+    any rows are appended)"""
+    for letter, width in widths.items():
+        ws.column_dimensions[letter].width = width
+
+
+def _header_style(name: str, argb: str, centered: bool = False) -> NamedStyle:
+    """Bold white-on-color header style (8-char ARGB)"""
+    style = NamedStyle(name=name)
+    style.font = Font(bold=True, color="FFFFFF")
+    style.fill = PatternFill(start_color=argb, end_color=argb, fill_type="solid")
+    if centered:
+        style.alignment = Alignment(horizontal="center", vertical="center")
+    return style
+
+
+def _build_named_styles():
+    """One NamedStyle per look — openpyxl dedupes these into a single
+    styles.xml entry instead of emitting a style record per cell"""
+    stat_number = NamedStyle(name="stat_number")
+    stat_number.number_format = '0.00'
+
+    corr_number = NamedStyle(name="corr_number")
+    corr_number.number_format = '0.000'
+
+    report_title = NamedStyle(name="report_title")
+    report_title.font = Font(bold=True, size=14)
+
+    wrapped_text = NamedStyle(name="wrapped_text")
+    wrapped_text.alignment = Alignment(wrap_text=True, vertical="top")
+
+    return [
+        _header_style("header_blue", "FF4472C4", centered=True),
+        _header_style("header_green", "FF70AD47"),
+        _header_style("header_orange", "FFFFC000"),
+        _header_style("header_steel", "FF5B9BD5"),
+        _header_style("header_red", "FFC00000"),
+        stat_number,
+        corr_number,
+        report_title,
+        wrapped_text,
+    ]
+
+
 class ExcelReportGenerator:
     def __init__(self):
         self.logger = logger
-        
-    def generate_report(self, df: pd.DataFrame, analysis: Dict[str, Any], output_path: str) -> Optional[str]:
+        # Directories already created by this instance — batch pipelines
+        # write hundreds of reports into the same folder, so skip the
+        # repeat mkdir/stat syscalls
+        self._known_dirs: set = set()
+
+    def generate_report(self, df: pd.DataFrame, analysis: Dict[str, Any], output_path: str,
+                        engine: str = 'openpyxl') -> Optional[str]:
         """
         Generate professional Excel report with analysis results
-        
+
         Args:
             df: Original DataFrame
             analysis: Analysis results from DataAnalyzer
             output_path: Path to save Excel file
-            
+            engine: 'openpyxl' (default) or 'xlsxwriter' — the latter writes
+                in constant_memory mode, holding only one row in RAM, for
+                very large raw-data sheets
+
         Returns:
             Path to generated Excel file or None if failed
         """
         try:
             output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
+            parent = output_path.parent
+            if parent not in self._known_dirs:
+                parent.mkdir(parents=True, exist_ok=True)
+                self._known_dirs.add(parent)
+
             self.logger.info(f"Generating Excel report: {output_path}")
-            
-            # Create workbook
-            wb = Workbook()
-            wb.remove(wb.active)  # Remove default sheet
-            
-            # Add sheets
-            self._add_data_sheet(wb, df)
-            self._add_summary_stats_sheet(wb, analysis)
-            self._add_data_quality_sheet(wb, analysis)
-            self._add_correlations_sheet(wb, analysis)
-            self._add_outliers_sheet(wb, analysis)
-            self._add_insights_sheet(wb, analysis)
-            
-            # Save
-            wb.save(str(output_path))
-            self.logger.info(f"Report generated successfully: {output_path}")
-            
-            return str(output_path)
-            
+
+            if engine == 'xlsxwriter':
+                if xlsxwriter is not None:
+                    return self._generate_with_xlsxwriter(df, analysis, output_path)
+                self.logger.warning("xlsxwriter not installed, falling back to openpyxl")
+
+            wb = self.open_workbook()
+            self.write_raw_sheet(wb, df)
+            return self.finalize_report(wb, analysis, output_path)
+
+        except Exception as e:
+            self.logger.error(f"Error generating Excel report: {e}", exc_info=True)
+            return None
+
+    def open_workbook(self) -> Workbook:
+        """Create a write-only workbook with the shared styles registered
+
+        Write-only mode streams rows straight to XML instead of
+        materializing a Cell object per value (~50x less memory on large
+        frames).
+        """
+        wb = Workbook(write_only=True)
+        for style in _build_named_styles():
+            wb.add_named_style(style)
+        return wb
+
+    def write_raw_sheet(self, wb: Workbook, df: pd.DataFrame):
+        """Stream the raw-data sheet; safe to run while the analysis is
+        still being computed elsewhere, so callers can overlap the two"""
+        self._add_data_sheet(wb, df)
+
+    def finalize_report(self, wb: Workbook, analysis: Dict[str, Any],
+                        output_path=None, return_bytes: bool = False):
+        """Write the analysis sheets and save the workbook
+
+        Saves to output_path when given; with return_bytes the serialized
+        workbook comes back as a BytesIO so callers (the bot upload path)
+        can skip the disk round-trip entirely.
+        """
+        try:
+            # Build the analysis sheets' rows in worker threads; emission
+            # stays serial because openpyxl workbooks are not thread-safe
+            # for writes
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [
+                    executor.submit(self._build_summary_stats_rows, analysis),
+                    executor.submit(self._build_data_quality_rows, analysis),
+                    executor.submit(self._build_correlations_rows, analysis),
+                    executor.submit(self._build_outliers_rows, analysis),
+                    executor.submit(self._build_insights_rows, analysis),
+                ]
+                for future in futures:
+                    self._emit_sheet(wb, future.result())
+
+            # Serialize to memory first, then flush with one write: the
+            # zip container otherwise hits the disk as many small writes
+            buf = BytesIO()
+            wb.save(buf)
+
+            if output_path is not None:
+                output_path = Path(output_path)
+                parent = output_path.parent
+                if parent not in self._known_dirs:
+                    parent.mkdir(parents=True, exist_ok=True)
+                    self._known_dirs.add(parent)
+                output_path.write_bytes(buf.getbuffer())
+                self.logger.info(f"Report generated successfully: {output_path}")
+
+            if return_bytes:
+                buf.seek(0)
+                return buf
+            return str(output_path) if output_path is not None else None
+
         except Exception as e:
             self.logger.error(f"Error generating Excel report: {e}", exc_info=True)
             return None
 
+    def _generate_with_xlsxwriter(self, df: pd.DataFrame, analysis: Dict[str, Any],
+                                  output_path: Path) -> str:
+        """Stream the report through xlsxwriter in constant_memory mode"""
+        wb = xlsxwriter.Workbook(str(output_path), {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd',
+            'nan_inf_to_errors': True,
+        })
+        try:
+            # Formats are registered once and reused — never built per cell
+            header_fmt = {
+                'Raw Data': wb.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#4472C4',
+                                           'align': 'center', 'valign': 'vcenter'}),
+                'Summary Statistics': wb.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#70AD47'}),
+                'Data Quality': wb.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#FFC000'}),
+                'Correlations': wb.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#5B9BD5'}),
+                'Outliers': wb.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#C00000'}),
+            }
+            title_fmt = wb.add_format({'bold': True, 'font_size': 14})
+            stat_fmt = wb.add_format({'num_format': '0.00'})
+            corr_fmt = wb.add_format({'num_format': '0.000'})
+            wrap_fmt = wb.add_format({'text_wrap': True, 'valign': 'top'})
+
+            # Raw data
+            ws = wb.add_worksheet("Raw Data")
+            ws.set_column(0, max(len(df.columns) - 1, 0), 20)
+            ws.write_row(0, 0, [str(c) for c in df.columns], header_fmt['Raw Data'])
+            # Same sanitization as _add_data_sheet: native scalars with
+            # NaN/NaT as None, which xlsxwriter writes as blank cells
+            rows = df.astype(object).where(df.notna(), None).to_numpy().tolist()
+            for row_num, row in enumerate(rows, 1):
+                ws.write_row(row_num, 0, row)
+            ws.autofilter(0, 0, len(df), max(len(df.columns) - 1, 0))
+
+            # Summary statistics
+            ws = wb.add_worksheet("Summary Statistics")
+            stats = analysis.get('descriptive_stats', {})
+            if not stats or 'note' in stats:
+                ws.write(0, 0, "No numeric data available for statistics")
+            else:
+                ws.set_column(0, 8, 15)
+                ws.write_row(0, 0, ['Column', 'Mean', 'Median', 'Std Dev', 'Min', 'Max',
+                                    'Q25', 'Q75', 'Skewness'], header_fmt['Summary Statistics'])
+                keys = ('mean', 'median', 'std', 'min', 'max', 'q25', 'q75', 'skewness')
+                row_num = 1
+                for col_name, col_stats in stats.items():
+                    if isinstance(col_stats, dict):
+                        ws.write(row_num, 0, col_name)
+                        ws.write_row(row_num, 1, [col_stats.get(k, '') for k in keys], stat_fmt)
+                        row_num += 1
+
+            # Data quality
+            ws = wb.add_worksheet("Data Quality")
+            quality = analysis.get('data_quality', {})
+            ws.set_column(0, 1, 20)
+            ws.write(0, 0, "Data Quality Report", title_fmt)
+            ws.write_row(2, 0, ["Metric", "Value"], header_fmt['Data Quality'])
+            rows = [("Duplicate Rows", quality.get('duplicate_rows', 0)),
+                    ("Duplicate %", f"{quality.get('duplicate_percentage', 0):.2f}%")]
+            missing = quality.get('missing_values', {})
+            if missing:
+                rows.append(("Missing Values", sum(missing.values())))
+            data_types = quality.get('data_types', {})
+            if data_types:
+                rows.append(("Numeric Columns", data_types.get('numeric', 0)))
+                rows.append(("Categorical Columns", data_types.get('categorical', 0)))
+            for row_num, row in enumerate(rows, 3):
+                ws.write_row(row_num, 0, row)
+
+            # Correlations
+            ws = wb.add_worksheet("Correlations")
+            strong_corr = analysis.get('correlations', {}).get('strong_correlations', {})
+            if not strong_corr:
+                ws.write(0, 0, "No strong correlations found (threshold: 0.7)")
+            else:
+                ws.set_column(0, 0, 30)
+                ws.set_column(1, 1, 15)
+                ws.write_row(0, 0, ["Column Pair", "Correlation"], header_fmt['Correlations'])
+                for row_num, (pair, corr_value) in enumerate(strong_corr.items(), 1):
+                    ws.write(row_num, 0, pair)
+                    ws.write(row_num, 1, f"{corr_value:.3f}", corr_fmt)
+
+            # Outliers
+            ws = wb.add_worksheet("Outliers")
+            outliers = analysis.get('outliers', {})
+            if 'note' in outliers or not outliers:
+                ws.write(0, 0, outliers.get('note', "No outliers detected"))
+            else:
+                ws.set_column(0, 0, 20)
+                ws.set_column(1, 2, 15)
+                ws.write_row(0, 0, ["Column", "Count", "Percentage"], header_fmt['Outliers'])
+                for row_num, (col_name, info) in enumerate(outliers.items(), 1):
+                    ws.write_row(row_num, 0, (col_name, info.get('count', 0),
+                                              f"{info.get('percentage', 0):.2f}%"))
+
+            # Insights
+            ws = wb.add_worksheet("Insights")
+            ws.set_column(0, 0, 80)
+            ws.write(0, 0, "Analysis Insights & Recommendations", title_fmt)
+            insights_list = analysis.get('insights', {}).get('insights', [])
+            for row_num, insight in enumerate(insights_list, 2):
+                ws.write(row_num, 0, insight, wrap_fmt)
+        except Exception:
+            # Close flushes whatever was written — remove the partial file
+            # before letting generate_report's handler log the error
+            wb.close()
+            Path(output_path).unlink(missing_ok=True)
+            raise
+        else:
+            wb.close()
+
+        self.logger.info(f"Report generated successfully: {output_path}")
+        return str(output_path)
+
+    def _styled_cell(self, ws, value, style: str) -> WriteOnlyCell:
+        """Cell carrying one of the registered named styles"""
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
     def _add_data_sheet(self, wb: Workbook, df: pd.DataFrame):
         """Add original data sheet"""
-        ws = wb.create_sheet("Raw Data", 0)
-        
+        ws = wb.create_sheet("Raw Data")
+
+        _set_column_widths(ws, {_col_letter(i): 20 for i in range(1, len(df.columns) + 1)})
+
         # Add headers
-        for col_num, col_name in enumerate(df.columns, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = col_name
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Add data
-        for row_num, row in enumerate(df.values, 2):
-            for col_num, value in enumerate(row, 1):
-                cell = ws.cell(row=row_num, column=col_num)
-                cell.value = value
-                cell.alignment = Alignment(horizontal="left", vertical="center")
-        
-        # Adjust column widths
-        for col_num in range(1, len(df.columns) + 1):
-            ws.column_dimensions[get_column_letter(col_num)].width = 20
-        
+        ws.append([self._styled_cell(ws, col_name, "header_blue") for col_name in df.columns])
+
+        # Convert the whole frame to native Python scalars in one columnar
+        # pass (NaN/NaT become None, which openpyxl writes as empty) so the
+        # per-cell value setter never sees a numpy type to coerce
+        rows = df.astype(object).where(df.notna(), None).to_numpy().tolist()
+        for row in rows:
+            ws.append(row)
+
         # Add filter
-        ws.auto_filter.ref = f"A1:{get_column_letter(len(df.columns))}{len(df) + 1}"
+        ws.auto_filter.ref = f"A1:{_col_letter(len(df.columns))}{len(df) + 1}"
+
+    def _emit_sheet(self, wb: Workbook, spec):
+        """Write one prebuilt sheet spec (title, widths, rows) to the workbook.
+        Cells given as (value, style_name) tuples get the named style."""
+        title, widths, rows = spec
+        ws = wb.create_sheet(title)
+        _set_column_widths(ws, widths)
+        for row in rows:
+            ws.append([
+                self._styled_cell(ws, value[0], value[1]) if isinstance(value, tuple) else value
+                for value in row
+            ])
 
-    def _add_summary_stats_sheet(self, wb: Workbook, analysis: Dict[str, Any]):
-        """Add summary statistics sheet"""
-        ws = wb.create_sheet("Summary Statistics", 1)
-        
+    def _build_summary_stats_rows(self, analysis: Dict[str, Any]):
+        """Build summary statistics sheet rows"""
         stats = analysis.get('descriptive_stats', {})
         if not stats or 'note' in stats:
-            ws['A1'] = "No numeric data available for statistics"
-            return
-        
-        row = 1
-        # Headers
+            return ("Summary Statistics", {}, [["No numeric data available for statistics"]])
+
         headers = ['Column', 'Mean', 'Median', 'Std Dev', 'Min', 'Max', 'Q25', 'Q75', 'Skewness']
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col_num)
-            cell.value = header
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
-        
-        # Add statistics
-        row = 2
-        for col_name, col_stats in stats.items():
-            if isinstance(col_stats, dict):
-                ws.cell(row=row, column=1).value = col_name
-                ws.cell(row=row, column=2).value = col_stats.get('mean', '')
-                ws.cell(row=row, column=3).value = col_stats.get('median', '')
-                ws.cell(row=row, column=4).value = col_stats.get('std', '')
-                ws.cell(row=row, column=5).value = col_stats.get('min', '')
-                ws.cell(row=row, column=6).value = col_stats.get('max', '')
-                ws.cell(row=row, column=7).value = col_stats.get('q25', '')
-                ws.cell(row=row, column=8).value = col_stats.get('q75', '')
-                ws.cell(row=row, column=9).value = col_stats.get('skewness', '')
-                row += 1
-        
-        # Format numbers
-        for row in ws.iter_rows(min_row=2, max_row=row-1, min_col=2, max_col=9):
-            for cell in row:
-                cell.number_format = '0.00'
-        
-        # Adjust widths
-        for col_num in range(1, 10):
-            ws.column_dimensions[get_column_letter(col_num)].width = 15
-
-    def _add_data_quality_sheet(self, wb: Workbook, analysis: Dict[str, Any]):
-        """Add data quality sheet"""
-        ws = wb.create_sheet("Data Quality", 2)
-        
+        rows = [[(header, "header_green") for header in headers]]
+
+        keys = ('mean', 'median', 'std', 'min', 'max', 'q25', 'q75', 'skewness')
+        rows.extend(
+            [col_name] + [(col_stats.get(key, ''), "stat_number") for key in keys]
+            for col_name, col_stats in stats.items() if isinstance(col_stats, dict)
+        )
+
+        return ("Summary Statistics", {_col_letter(i): 15 for i in range(1, 10)}, rows)
+
+    def _build_data_quality_rows(self, analysis: Dict[str, Any]):
+        """Build data quality sheet rows"""
         quality = analysis.get('data_quality', {})
-        
-        row = 1
-        ws.cell(row=row, column=1).value = "Data Quality Report"
-        ws.cell(row=row, column=1).font = Font(bold=True, size=14)
-        
-        row += 2
-        ws.cell(row=row, column=1).value = "Metric"
-        ws.cell(row=row, column=2).value = "Value"
-        for col in [1, 2]:
-            ws.cell(row=row, column=col).font = Font(bold=True, color="FFFFFF")
-            ws.cell(row=row, column=col).fill = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
-        
-        row += 1
-        ws.cell(row=row, column=1).value = "Duplicate Rows"
-        ws.cell(row=row, column=2).value = quality.get('duplicate_rows', 0)
-        row += 1
-        
-        ws.cell(row=row, column=1).value = "Duplicate %"
-        ws.cell(row=row, column=2).value = f"{quality.get('duplicate_percentage', 0):.2f}%"
-        row += 1
-        
+
+        rows = [
+            [("Data Quality Report", "report_title")],
+            [],
+            [("Metric", "header_orange"), ("Value", "header_orange")],
+            ["Duplicate Rows", quality.get('duplicate_rows', 0)],
+            ["Duplicate %", f"{quality.get('duplicate_percentage', 0):.2f}%"],
+        ]
+
         missing = quality.get('missing_values', {})
         if missing:
-            ws.cell(row=row, column=1).value = "Missing Values"
-            ws.cell(row=row, column=2).value = sum(missing.values())
-            row += 1
-        
+            rows.append(["Missing Values", sum(missing.values())])
+
         data_types = quality.get('data_types', {})
         if data_types:
-            ws.cell(row=row, column=1).value = "Numeric Columns"
-            ws.cell(row=row, column=2).value = data_types.get('numeric', 0)
-            row += 1
-            
-            ws.cell(row=row, column=1).value = "Categorical Columns"
-            ws.cell(row=row, column=2).value = data_types.get('categorical', 0)
-            row += 1
-        
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 20
-
-    def _add_correlations_sheet(self, wb: Workbook, analysis: Dict[str, Any]):
-        """Add correlations sheet"""
-        ws = wb.create_sheet("Correlations", 3)
-        
+            rows.append(["Numeric Columns", data_types.get('numeric', 0)])
+            rows.append(["Categorical Columns", data_types.get('categorical', 0)])
+
+        return ("Data Quality", {'A': 20, 'B': 20}, rows)
+
+    def _build_correlations_rows(self, analysis: Dict[str, Any]):
+        """Build correlations sheet rows"""
         corr = analysis.get('correlations', {})
         strong_corr = corr.get('strong_correlations', {})
-        
+
         if not strong_corr:
-            ws['A1'] = "No strong correlations found (threshold: 0.7)"
-            return
-        
-        row = 1
-        ws.cell(row=row, column=1).value = "Column Pair"
-        ws.cell(row=row, column=2).value = "Correlation"
-        for col in [1, 2]:
-            ws.cell(row=row, column=col).font = Font(bold=True, color="FFFFFF")
-            ws.cell(row=row, column=col).fill = PatternFill(start_color="5B9BD5", end_color="5B9BD5", fill_type="solid")
-        
-        row = 2
-        for pair, corr_value in strong_corr.items():
-            ws.cell(row=row, column=1).value = pair
-            ws.cell(row=row, column=2).value = f"{corr_value:.3f}"
-            ws.cell(row=row, column=2).number_format = '0.000'
-            row += 1
-        
-        ws.column_dimensions['A'].width = 30
-        ws.column_dimensions['B'].width = 15
-
-    def _add_outliers_sheet(self, wb: Workbook, analysis: Dict[str, Any]):
-        """Add outliers sheet"""
-        ws = wb.create_sheet("Outliers", 4)
-        
+            return ("Correlations", {}, [["No strong correlations found (threshold: 0.7)"]])
+
+        rows = [[("Column Pair", "header_steel"), ("Correlation", "header_steel")]]
+        rows.extend(
+            [pair, (f"{corr_value:.3f}", "corr_number")]
+            for pair, corr_value in strong_corr.items()
+        )
+
+        return ("Correlations", {'A': 30, 'B': 15}, rows)
+
+    def _build_outliers_rows(self, analysis: Dict[str, Any]):
+        """Build outliers sheet rows"""
         outliers = analysis.get('outliers', {})
-        
-        if 'note' in outliers:
-            ws['A1'] = outliers['note']
-            return
-        
-        if not outliers:
-            ws['A1'] = "No outliers detected"
-            return
-        
-        row = 1
-        ws.cell(row=row, column=1).value = "Column"
-        ws.cell(row=row, column=2).value = "Count"
-        ws.cell(row=row, column=3).value = "Percentage"
-        for col in [1, 2, 3]:
-            ws.cell(row=row, column=col).font = Font(bold=True, color="FFFFFF")
-            ws.cell(row=row, column=col).fill = PatternFill(start_color="C00000", end_color="C00000", fill_type="solid")
-        
-        row = 2
-        for col_name, outlier_info in outliers.items():
-            ws.cell(row=row, column=1).value = col_name
-            ws.cell(row=row, column=2).value = outlier_info.get('count', 0)
-            ws.cell(row=row, column=3).value = f"{outlier_info.get('percentage', 0):.2f}%"
-            row += 1
-        
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 15
-
-    def _add_insights_sheet(self, wb: Workbook, analysis: Dict[str, Any]):
-        """Add insights and recommendations sheet"""
-        ws = wb.create_sheet("Insights", 5)
-        
-        ws['A1'] = "Analysis Insights & Recommendations"
-        ws['A1'].font = Font(bold=True, size=14)
-        
-        insights_data = analysis.get('insights', {})
-        insights_list = insights_data.get('insights', [])
-        
-        row = 3
-        for insight in insights_list:
-            ws.cell(row=row, column=1).value = insight
-            ws.cell(row=row, column=1).alignment = Alignment(wrap_text=True, vertical="top")
-            row += 1
-        
-        ws.column_dimensions['A'].width = 80
-        for row_num in range(3, row):
-            ws.row_dimensions[row_num].height = 30
+
+        if 'note' in outliers or not outliers:
+            return ("Outliers", {}, [[outliers.get('note', "No outliers detected")]])
+
+        rows = [[("Column", "header_red"), ("Count", "header_red"), ("Percentage", "header_red")]]
+        rows.extend(
+            [col_name,
+             outlier_info.get('count', 0),
+             f"{outlier_info.get('percentage', 0):.2f}%"]
+            for col_name, outlier_info in outliers.items()
+        )
+
+        return ("Outliers", {'A': 20, 'B': 15, 'C': 15}, rows)
+
+    def _build_insights_rows(self, analysis: Dict[str, Any]):
+        """Build insights and recommendations sheet rows"""
+        insights_list = analysis.get('insights', {}).get('insights', [])
+
+        rows = [[("Analysis Insights & Recommendations", "report_title")], []]
+        rows.extend([(insight, "wrapped_text")] for insight in insights_list)
+
+        return ("Insights", {'A': 80}, rows)
 
 
 def generate_report(df: pd.DataFrame, analysis: Dict[str, Any], output_path: str) -> Optional[str]:
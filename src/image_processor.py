@@ -1,20 +1,80 @@
 import logging
+import os
+import threading
 import cv2
 import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Optional, List, Tuple
 import easyocr
+import pytesseract
+from scipy.signal import find_peaks
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+try:
+    # In-process tesseract API — keeps one engine alive instead of
+    # spawning a tesseract subprocess per call like pytesseract does
+    import tesserocr
+    from PIL import Image
+except ImportError:
+    tesserocr = None
 
 logger = logging.getLogger(__name__)
 
+# Turn on OpenCV's SIMD-optimized code paths and give its internal ops a
+# bounded thread count — half the cores, leaving room for the bot's own
+# compute pool
+cv2.setUseOptimized(True)
+cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))
+
+# Minimum detections for the tesseract fast path to be trusted before
+# falling back to EasyOCR
+MIN_TESSERACT_BOXES = 4
+
+# Longest side kept after decode; table text reads fine at ~300 DPI and
+# tesseract's layout analysis is O(pixels), so 12MP phone photos get
+# shrunk before any OCR sees them
+MAX_IMAGE_SIDE = 2000
+
+# Longest image side fed to EasyOCR's detector; its CNN scales ~linearly
+# with pixel count and table text survives 1024px fine, so big scans get
+# shrunk before inference (set max_ocr_side=0 to disable)
+MAX_OCR_SIDE = 1024
+
+# EasyOCR readers keyed by (languages, gpu) — loading one means pulling
+# ~200MB of torch weights, so share them process-wide
+_READER_CACHE: dict = {}
+
 
 class ImageProcessor:
-    def __init__(self, ocr_languages=['en'], use_gpu=False):
-        """Initialize OCR reader"""
-        self.reader = easyocr.Reader(ocr_languages, gpu=use_gpu)
+    def __init__(self, ocr_languages=['en'], use_gpu=False, use_tesseract_first=True,
+                 max_ocr_side=MAX_OCR_SIDE):
+        """Initialize OCR settings; the EasyOCR reader itself loads lazily"""
+        self.ocr_languages = list(ocr_languages)
+        # Use CUDA whenever available — the neural OCR stage dominates the
+        # pipeline and runs far faster on GPU (needs easyocr>=1.6 + CUDA torch)
+        self.use_gpu = use_gpu or (torch is not None and torch.cuda.is_available())
+        self._use_tesseract_first = use_tesseract_first
+        self.max_ocr_side = max_ocr_side
+        # Persistent tesserocr engine (lazy); the lock serializes access
+        # since one API instance is not thread-safe
+        self._tess_api = None
+        self._tess_lock = threading.Lock()
         self.logger = logger
 
+    @property
+    def reader(self):
+        """Shared EasyOCR reader, constructed on first use"""
+        key = (tuple(self.ocr_languages), self.use_gpu)
+        if key not in _READER_CACHE:
+            self.logger.info(f"Loading EasyOCR reader (languages={self.ocr_languages}, gpu={self.use_gpu})")
+            _READER_CACHE[key] = easyocr.Reader(self.ocr_languages, gpu=self.use_gpu)
+        return _READER_CACHE[key]
+
     def extract_data_from_image(self, image_path: str) -> Optional[pd.DataFrame]:
         """
         Extract tabular data from image using OCR with spatial awareness
@@ -36,9 +96,63 @@ class ImageProcessor:
             if img is None:
                 self.logger.error(f"Failed to read image: {image_path}")
                 return None
-            
-            # Extract text with spatial information
-            results = self.reader.readtext(img)
+
+            return self._extract_from_array(img)
+
+        except Exception as e:
+            self.logger.error(f"Error extracting data from image: {e}", exc_info=True)
+            return None
+
+    def extract_data_from_image_bytes(self, buf: bytes) -> Optional[pd.DataFrame]:
+        """
+        Extract tabular data from an in-memory encoded image (e.g. a photo
+        downloaded straight from Telegram), skipping the disk round-trip
+
+        Args:
+            buf: Encoded image bytes (JPEG/PNG/...)
+
+        Returns:
+            DataFrame with extracted data or None if extraction fails
+        """
+        try:
+            img = cv2.imdecode(np.frombuffer(buf, np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                self.logger.error("Failed to decode image bytes")
+                return None
+
+            return self._extract_from_array(img)
+
+        except Exception as e:
+            self.logger.error(f"Error extracting data from image bytes: {e}", exc_info=True)
+            return None
+
+    def _extract_from_array(self, img: np.ndarray) -> Optional[pd.DataFrame]:
+        """Shared OCR + spatial-parse pipeline for a decoded BGR image"""
+        try:
+            # Cap resolution before anything touches the pixels; all
+            # downstream coordinates stay consistent with the resized frame
+            h, w = img.shape[:2]
+            scale = MAX_IMAGE_SIDE / max(h, w)
+            if scale < 1.0:
+                img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+            # Grayscale once with OpenCV's vectorized conversion; EasyOCR
+            # accepts single-channel input and skips its own BGR handling
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+            # Extract text with spatial information. Tesseract handles
+            # printed scans 3-10x faster on CPU than EasyOCR's neural
+            # models, so try it first and fall back when it finds too little
+            results = None
+            if self._use_tesseract_first:
+                results = self._extract_with_tesseract(gray)
+            if not results:
+                # Shrink big scans before the neural detector; boxes come
+                # back in downscaled coordinates and get mapped to the
+                # original frame so spatial parsing is unaffected
+                gray_small, scale = self._downscale_for_ocr(gray)
+                results = self.reader.readtext(gray_small)
+                results = self._rescale_results(results, scale)
             
             if not results:
                 self.logger.warning("No text detected in image")
@@ -58,6 +172,140 @@ class ImageProcessor:
             self.logger.error(f"Error extracting data from image: {e}", exc_info=True)
             return None
 
+    def extract_many(self, image_paths: List[str]) -> List[Optional[pd.DataFrame]]:
+        """
+        Extract tabular data from several images in one batched OCR pass
+
+        Returns one DataFrame (or None) per input path, in order. Batching
+        amortizes model dispatch across images; single images should keep
+        using extract_data_from_image.
+        """
+        dfs: List[Optional[pd.DataFrame]] = [None] * len(image_paths)
+        grays, scales, indices = [], [], []
+        for i, path in enumerate(image_paths):
+            img = cv2.imread(str(path))
+            if img is None:
+                self.logger.error(f"Failed to read image: {path}")
+                continue
+            cap = MAX_IMAGE_SIDE / max(img.shape[:2])
+            if cap < 1.0:
+                img = cv2.resize(img, None, fx=cap, fy=cap, interpolation=cv2.INTER_AREA)
+            gray_small, scale = self._downscale_for_ocr(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+            grays.append(gray_small)
+            scales.append(scale)
+            indices.append(i)
+
+        if not grays:
+            return dfs
+
+        # The downscales preserve aspect ratio, so shapes differ across the
+        # batch; easyocr stacks the list into one array and chokes on
+        # ragged input. Pad everything to the largest frame with white —
+        # padding carries no text and leaves box coordinates untouched.
+        shapes = [g.shape for g in grays]
+        max_h = max(h for h, _ in shapes)
+        max_w = max(w for _, w in shapes)
+        if any(s != (max_h, max_w) for s in shapes):
+            grays = [
+                cv2.copyMakeBorder(g, 0, max_h - g.shape[0], 0, max_w - g.shape[1],
+                                   cv2.BORDER_CONSTANT, value=255)
+                for g in grays
+            ]
+
+        try:
+            results_per_image = self.reader.readtext_batched(grays, batch_size=16, workers=0)
+        except Exception as e:
+            self.logger.error(f"Batched OCR failed: {e}", exc_info=True)
+            return dfs
+
+        for i, (h, w), scale, results in zip(indices, shapes, scales, results_per_image):
+            if results:
+                results = self._rescale_results(results, scale)
+                dfs[i] = self._parse_spatial_table(results, (h / scale, w / scale))
+        return dfs
+
+    def _downscale_for_ocr(self, gray):
+        """Shrink a grayscale image so its longest side is max_ocr_side,
+        returning (image, scale); INTER_AREA keeps text edges clean"""
+        if not self.max_ocr_side:
+            return gray, 1.0
+        scale = self.max_ocr_side / max(gray.shape)
+        if scale >= 1.0:
+            return gray, 1.0
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA), scale
+
+    @staticmethod
+    def _rescale_results(results, scale):
+        """Map OCR bboxes from downscaled coordinates back to the original frame"""
+        if scale == 1.0:
+            return results
+        inv = 1.0 / scale
+        return [
+            ([[x * inv, y * inv] for x, y in bbox], text, conf)
+            for bbox, text, conf in results
+        ]
+
+    def _extract_with_tesseract(self, gray) -> List:
+        """Run tesseract on a grayscale image and return EasyOCR-shaped
+        results [(bbox, text, confidence), ...], or [] when unusable"""
+        if tesserocr is not None:
+            return self._extract_with_tesserocr(gray)
+        try:
+            data = pytesseract.image_to_data(
+                gray, output_type=pytesseract.Output.DICT, config='--psm 6 --oem 1'
+            )
+        except Exception as e:
+            self.logger.debug(f"Tesseract unavailable, using EasyOCR: {e}")
+            return []
+
+        results = []
+        for text, conf, x, y, w, h in zip(data['text'], data['conf'], data['left'],
+                                          data['top'], data['width'], data['height']):
+            text = text.strip()
+            if not text or float(conf) < 0:
+                continue
+            bbox = [[x, y], [x + w, y], [x + w, y + h], [x, y + h]]
+            results.append((bbox, text, float(conf) / 100))
+
+        if len(results) < MIN_TESSERACT_BOXES:
+            self.logger.debug(f"Tesseract found only {len(results)} boxes, using EasyOCR")
+            return []
+        return results
+
+    def _extract_with_tesserocr(self, gray) -> List:
+        """Word-level recognition through a persistent tesserocr engine,
+        amortizing tesseract init across calls; same output shape as
+        _extract_with_tesseract"""
+        try:
+            with self._tess_lock:
+                if self._tess_api is None:
+                    self._tess_api = tesserocr.PyTessBaseAPI(
+                        psm=tesserocr.PSM.SINGLE_BLOCK, oem=tesserocr.OEM.LSTM_ONLY
+                    )
+                api = self._tess_api
+                api.SetImage(Image.fromarray(gray))
+                api.Recognize()
+                results = []
+                it = api.GetIterator()
+                level = tesserocr.RIL.WORD
+                while it:
+                    text = (it.GetUTF8Text(level) or '').strip()
+                    box = it.BoundingBox(level)
+                    if text and box is not None and it.Confidence(level) >= 0:
+                        x1, y1, x2, y2 = box
+                        bbox = [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+                        results.append((bbox, text, it.Confidence(level) / 100))
+                    if not it.Next(level):
+                        break
+        except Exception as e:
+            self.logger.debug(f"tesserocr unavailable, using EasyOCR: {e}")
+            return []
+
+        if len(results) < MIN_TESSERACT_BOXES:
+            self.logger.debug(f"tesserocr found only {len(results)} boxes, using EasyOCR")
+            return []
+        return results
+
     def _parse_spatial_table(self, ocr_results: List, img_shape: Tuple) -> Optional[pd.DataFrame]:
         """
         Parse OCR results into table using spatial layout
@@ -69,34 +317,40 @@ class ImageProcessor:
             if not ocr_results:
                 return None
             
-            # Extract text boxes with positions
-            text_boxes = []
-            for bbox, text, conf in ocr_results:
-                # Get bounding box coordinates
-                x_coords = [point[0] for point in bbox]
-                y_coords = [point[1] for point in bbox]
-                
-                x_min, x_max = min(x_coords), max(x_coords)
-                y_min, y_max = min(y_coords), max(y_coords)
-                x_center = (x_min + x_max) / 2
-                y_center = (y_min + y_max) / 2
-                
-                text_boxes.append({
-                    'text': text.strip(),
-                    'x_min': x_min,
-                    'x_max': x_max,
-                    'y_min': y_min,
-                    'y_max': y_max,
-                    'x_center': x_center,
-                    'y_center': y_center,
-                    'confidence': conf
-                })
-            
-            # Sort by vertical position (top to bottom)
-            text_boxes.sort(key=lambda x: x['y_center'])
-            
-            # Group into rows by vertical proximity
-            rows = self._group_into_rows(text_boxes)
+            # Vectorized bbox math: stack all corners into one (N, 4, 2)
+            # array and reduce per box in C instead of four Python loops each
+            boxes = np.asarray([r[0] for r in ocr_results], dtype=np.float32)
+            texts = [r[1] for r in ocr_results]
+            confs = np.fromiter((r[2] for r in ocr_results), np.float32, count=len(ocr_results))
+
+            xs = boxes[:, :, 0]
+            ys = boxes[:, :, 1]
+            x_min = xs.min(axis=1)
+            x_max = xs.max(axis=1)
+            y_min = ys.min(axis=1)
+            y_max = ys.max(axis=1)
+            x_center = (x_min + x_max) * 0.5
+            y_center = (y_min + y_max) * 0.5
+
+            # Structure-of-arrays: one DataFrame column per coordinate keeps
+            # everything in contiguous numpy arrays for the spatial passes
+            # below, instead of per-box dicts hashed on every access
+            boxes = pd.DataFrame({
+                'text': [t.strip() for t in texts],
+                'x_min': x_min,
+                'x_max': x_max,
+                'y_min': y_min,
+                'y_max': y_max,
+                'x_center': x_center,
+                'y_center': y_center,
+                'confidence': confs,
+            })
+            box_texts = boxes['text'].to_numpy()
+            box_xc = boxes['x_center'].to_numpy()
+
+            # Group into rows by vertical proximity (positional indices,
+            # x-sorted within each row)
+            rows = self._group_into_rows(boxes)
             
             self.logger.info(f"Grouped into {len(rows)} rows")
             for i, row in enumerate(rows[:5]):
@@ -105,8 +359,7 @@ class ImageProcessor:
             if not rows or len(rows) < 2:
                 # Fallback: create single column DataFrame
                 self.logger.warning("Not enough rows, using fallback")
-                df = pd.DataFrame({'Data': [box['text'] for box in text_boxes]})
-                return df
+                return pd.DataFrame({'Data': box_texts})
             
             # Find the row with most cells among the first few rows (headers are at the top)
             # Only check first 5 rows to avoid picking data rows with extra splits
@@ -115,109 +368,129 @@ class ImageProcessor:
             header_row = rows[header_row_idx]
             
             self.logger.info(f"Selected row {header_row_idx} as header (has {len(header_row)} cells)")
-            self.logger.info(f"Header texts: {[box['text'] for box in header_row[:5]]}")
+            self.logger.info(f"Header texts: {list(box_texts[header_row[:5]])}")
             
-            # Determine columns from header row
-            column_positions = self._detect_columns(header_row)
+            # Determine columns from all boxes, guided by the header row
+            column_positions = self._detect_columns(boxes, header_row, img_shape)
             
             # Build table using header row and subsequent rows
             # Extract headers
-            headers = [box['text'].strip() for box in header_row]
+            headers = list(box_texts[header_row])
             
             # Build data rows (only rows after header row)
             table_data = []
-            for row_idx, row_boxes in enumerate(rows):
+            for row_idx, row_indices in enumerate(rows):
                 # Skip rows before header row
                 if row_idx <= header_row_idx:
                     continue
                     
                 row_data = [''] * len(column_positions)
-                for box in row_boxes:
-                    # Find which column this box belongs to
-                    col_idx = self._assign_to_column(box, column_positions)
+                # Assign every box in the row to its nearest column in one
+                # binary-search call instead of a linear scan per box
+                col_indices = self._assign_to_columns(box_xc[row_indices], column_positions)
+                for box_idx, col_idx in zip(row_indices, col_indices):
                     if col_idx < len(row_data):
                         # Append if cell already has content
                         if row_data[col_idx]:
-                            row_data[col_idx] += ' ' + box['text']
+                            row_data[col_idx] += ' ' + box_texts[box_idx]
                         else:
-                            row_data[col_idx] = box['text']
+                            row_data[col_idx] = box_texts[box_idx]
                 table_data.append(row_data)
             
             # Create DataFrame
             if not table_data:
-                return pd.DataFrame({'Data': [box['text'] for box in text_boxes]})
+                return pd.DataFrame({'Data': box_texts})
             
             # Clean headers
             headers = [str(h).strip() if h else f'Column_{i}' for i, h in enumerate(headers)]
             
             df = pd.DataFrame(table_data, columns=headers)
             
-            # Try to convert numeric columns
+            # Try to convert numeric columns: coerce once and keep the result
+            # when nearly everything parsed, instead of exception-driven
+            # all-or-nothing conversion
             for col in df.columns:
-                try:
-                    df[col] = pd.to_numeric(df[col])
-                except (ValueError, TypeError):
-                    pass
+                coerced = pd.to_numeric(df[col], errors='coerce')
+                if coerced.notna().mean() > 0.9:
+                    df[col] = coerced
             
             return df
             
         except Exception as e:
             self.logger.debug(f"Failed to parse spatial table: {e}")
             # Fallback: single column
-            texts = [box['text'] for box in text_boxes]
+            texts = [r[1].strip() for r in ocr_results]
             return pd.DataFrame({'Data': texts}) if texts else None
 
-    def _group_into_rows(self, text_boxes: List[dict], y_threshold: float = 20) -> List[List[dict]]:
-        """Group text boxes into rows based on vertical position"""
-        if not text_boxes:
-            return []
-        
-        rows = []
-        current_row = [text_boxes[0]]
-        current_y = text_boxes[0]['y_center']
-        
-        for box in text_boxes[1:]:
-            # If box is close vertically to current row, add to current row
-            if abs(box['y_center'] - current_y) < y_threshold:
-                current_row.append(box)
-            else:
-                # Start new row
-                # Sort current row by x position (left to right)
-                current_row.sort(key=lambda x: x['x_center'])
-                rows.append(current_row)
-                current_row = [box]
-                current_y = box['y_center']
-        
-        # Add last row
-        if current_row:
-            current_row.sort(key=lambda x: x['x_center'])
-            rows.append(current_row)
-        
-        return rows
+    def _group_into_rows(self, boxes: pd.DataFrame, y_threshold: float = 20) -> List[np.ndarray]:
+        """Group text boxes into rows based on vertical position
 
-    def _detect_columns(self, first_row: List[dict]) -> List[float]:
-        """Detect column positions from first row"""
-        if not first_row:
+        Returns one array of positional indices into ``boxes`` per row,
+        sorted left-to-right. Run-length detection over the y-sorted
+        centers: a new row starts at every gap exceeding y_threshold, all
+        computed in vectorized numpy instead of a per-box Python branch.
+        """
+        if boxes.empty:
             return []
-        
-        # Use x_center of each box in first row as column positions
-        column_positions = [box['x_center'] for box in first_row]
-        column_positions.sort()
-        return column_positions
-
-    def _assign_to_column(self, box: dict, column_positions: List[float]) -> int:
-        """Assign a text box to the nearest column"""
-        if not column_positions:
-            return 0
-        
-        x = box['x_center']
-        
-        # Find nearest column
-        distances = [abs(x - col_pos) for col_pos in column_positions]
-        return distances.index(min(distances))
+
+        yc = boxes['y_center'].to_numpy()
+        xc = boxes['x_center'].to_numpy()
+
+        order = np.argsort(yc)
+        breaks = np.diff(yc[order]) > y_threshold
+        groups = np.split(order, np.flatnonzero(breaks) + 1)
+
+        # Left-to-right within each row
+        return [group[np.argsort(xc[group])] for group in groups]
+
+    def _detect_columns(self, boxes: pd.DataFrame, header_row: np.ndarray,
+                        img_shape: Tuple) -> np.ndarray:
+        """Detect sorted column positions
+
+        Clusters the x-centers of *all* boxes via a histogram (bin width ~
+        median token width) and takes the peaks — more robust than trusting
+        the header row alone when headers wrap or rows over-split. Falls
+        back to header-row centers when the peak count doesn't match the
+        header cell count, so headers and columns stay aligned.
+        """
+        if header_row.size == 0:
+            return np.array([], dtype=np.float32)
+
+        all_xc = boxes['x_center'].to_numpy()
+        widths = (boxes['x_max'] - boxes['x_min']).to_numpy()
+        median_width = max(float(np.median(widths)), 1.0)
+        img_w = img_shape[1]
+
+        bins = max(int(img_w / median_width), 1)
+        hist, edges = np.histogram(all_xc, bins=bins, range=(0, img_w))
+        peaks, _ = find_peaks(hist, distance=2)
+
+        if len(peaks) == len(header_row):
+            centers = (edges[peaks] + edges[peaks + 1]) / 2
+            return np.sort(centers).astype(np.float32)
+
+        # Fallback: x_center of each header cell
+        return np.sort(all_xc[header_row])
+
+    def _assign_to_columns(self, x_centers: np.ndarray, column_positions: np.ndarray) -> np.ndarray:
+        """Assign each x-center to the nearest (sorted) column position via
+        binary search; ties go to the left column like the old linear scan"""
+        if column_positions.size == 0:
+            return np.zeros(len(x_centers), dtype=np.intp)
+
+        idx = np.searchsorted(column_positions, x_centers)
+        left = np.clip(idx - 1, 0, column_positions.size - 1)
+        right = np.clip(idx, 0, column_positions.size - 1)
+        use_left = (x_centers - column_positions[left]) <= (column_positions[right] - x_centers)
+        return np.where(use_left, left, right)
+
+
+_default_processor: Optional[ImageProcessor] = None
 
 
 def extract_data_from_image(image_path: str) -> Optional[pd.DataFrame]:
     """Convenience function"""
-    processor = ImageProcessor()
-    return processor.extract_data_from_image(image_path)
+    global _default_processor
+    if _default_processor is None:
+        _default_processor = ImageProcessor()
+    return _default_processor.extract_data_from_image(image_path)
@@ -1,10 +1,16 @@
 import logging
 import asyncio
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
 from typing import Optional
 from telegram import Update, Bot
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 from telegram.error import TelegramError
+from telegram.request import HTTPXRequest
 import config
 from .image_processor import ImageProcessor
 from .data_analyzer import DataAnalyzer
@@ -12,6 +18,19 @@ from .excel_generator import ExcelReportGenerator
 
 logger = logging.getLogger(__name__)
 
+# Finished reports kept keyed by Telegram's stable file_unique_id, so a
+# re-sent photo skips OCR/analysis entirely
+RESULT_CACHE_SIZE = 128
+
+# Telegram's limit for media captions, measured in UTF-16 code units
+# (astral-plane emoji count as two)
+MAX_CAPTION_LENGTH = 1024
+
+
+def _utf16_len(text: str) -> int:
+    """Length as Telegram counts it: UTF-16 code units, not code points"""
+    return len(text.encode('utf-16-le')) // 2
+
 
 class DataAnalystBot:
     def __init__(self, token: str):
@@ -22,6 +41,31 @@ class DataAnalystBot:
         self.excel_generator = ExcelReportGenerator()
         self.logger = logger
         self._stop_event = asyncio.Event()
+        # OCR, pandas analysis and xlsx generation are synchronous and
+        # CPU-bound; running them inline would freeze the event loop for
+        # every other user. They go through this bounded pool instead
+        # (threads, not processes — the heavy kernels release the GIL).
+        self._cpu_pool = ThreadPoolExecutor(
+            max_workers=max(2, os.cpu_count() or 1), thread_name_prefix="cpu"
+        )
+        # Separate, wider pool for blocking disk I/O so a backlog of OCR
+        # jobs in the compute pool can never delay file reads/writes (and
+        # vice versa)
+        self._io_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="io")
+        # Backpressure: each photo job holds a decoded image plus a
+        # DataFrame in memory, so cap how many run at once
+        self._photo_sem = asyncio.Semaphore(config.MAX_CONCURRENT_PHOTOS)
+        # LRU of (xlsx bytes, filename, caption, overflow insights)
+        # per file_unique_id
+        self._result_cache: OrderedDict = OrderedDict()
+
+    async def _run_cpu(self, fn, *args):
+        """Run a blocking CPU-bound callable on the shared pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._cpu_pool, fn, *args)
+
+    async def _run_io(self, fn, *args):
+        """Run a blocking I/O callable on the dedicated I/O pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._io_pool, fn, *args)
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
@@ -77,71 +121,137 @@ Any questions? Just send me an image to get started!
     async def handle_photo(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle photo uploads"""
         try:
-            # Send processing message
-            processing_msg = await update.message.reply_text("🔄 Processing image... This may take a moment.")
-            
-            # Download photo
-            file = await context.bot.get_file(update.message.photo[-1].file_id)
-            
-            # Save to uploads directory
-            image_path = config.UPLOADS_DIR / f"{update.message.photo[-1].file_id}.jpg"
-            await file.download_to_drive(image_path)
-            
-            self.logger.info(f"Processing image from user {update.effective_user.id}")
-            
-            # Extract data
-            await processing_msg.edit_text("📸 Extracting data from image...")
-            df = self.image_processor.extract_data_from_image(str(image_path))
-            
-            if df is None or len(df) == 0:
-                await processing_msg.edit_text(
-                    "❌ Could not extract data from image. Make sure it contains a readable table."
+            photo = update.message.photo[-1]
+            file_unique_id = photo.file_unique_id
+            user_id = update.effective_user.id
+
+            # Re-sent photos carry the same file_unique_id — serve the
+            # cached report instead of re-running the whole pipeline
+            cached = self._result_cache.get(file_unique_id)
+            if cached is not None:
+                self._result_cache.move_to_end(file_unique_id)
+                xlsx_bytes, report_filename, caption, separate_insights = cached
+                await update.message.reply_document(
+                    document=BytesIO(xlsx_bytes), filename=report_filename, caption=caption
                 )
+                if separate_insights:
+                    await update.message.reply_text(f"💡 Insights:\n{separate_insights}")
                 return
+
+            # Let the user know if they're waiting on a slot; the semaphore
+            # below caps concurrent pipelines so peak memory stays bounded
+            if self._photo_sem.locked():
+                processing_msg = await update.message.reply_text(
+                    "⏳ Queued — your image will be processed as soon as a slot frees up."
+                )
+            else:
+                processing_msg = await update.message.reply_text("🔄 Processing image... This may take a moment.")
+
+            # Each status edit is a full HTTPS round-trip, so rate-limit
+            # them — fast stages coalesce into one visible update
+            last_edit = time.monotonic()
+
+            async def progress(text):
+                nonlocal last_edit
+                now = time.monotonic()
+                if now - last_edit >= 1.5:
+                    await processing_msg.edit_text(text)
+                    last_edit = now
+
+            async with self._photo_sem:
+                # Download photo straight into memory — writing the JPEG to
+                # disk only to re-read it for OCR costs a full write+read per photo
+                file = await context.bot.get_file(photo.file_id)
+                image_bytes = bytes(await file.download_as_bytearray())
+
+                if config.PERSIST_UPLOADS:
+                    image_path = config.UPLOADS_DIR / f"{photo.file_id}.jpg"
+                    await self._run_io(image_path.write_bytes, image_bytes)
+
+                self.logger.info(f"Processing image from user {user_id}")
+
+                # Extract data
+                await progress("📸 Extracting data from image...")
+                df = await self._run_cpu(self.image_processor.extract_data_from_image_bytes, image_bytes)
             
-            # Analyze data
-            await processing_msg.edit_text("📊 Analyzing data...")
-            analysis = self.data_analyzer.analyze_data(df)
+                if df is None or len(df) == 0:
+                    await processing_msg.edit_text(
+                        "❌ Could not extract data from image. Make sure it contains a readable table."
+                    )
+                    return
             
-            if 'error' in analysis:
-                await processing_msg.edit_text(f"❌ Analysis failed: {analysis['error']}")
-                return
+                # Analyze data while the report's raw-data sheet streams in
+                # parallel — the two only read df, and the analysis sheets
+                # are appended afterwards
+                await progress("📊 Analyzing data...")
+                wb = self.excel_generator.open_workbook()
+                analysis, _ = await asyncio.gather(
+                    self._run_cpu(self.data_analyzer.analyze_data, df),
+                    self._run_cpu(self.excel_generator.write_raw_sheet, wb, df),
+                )
             
-            # Generate Excel
-            await processing_msg.edit_text("📝 Generating Excel report...")
-            report_filename = f"analysis_{update.message.photo[-1].file_id}.xlsx"
-            report_path = config.REPORTS_DIR / report_filename
+                if 'error' in analysis:
+                    await processing_msg.edit_text(f"❌ Analysis failed: {analysis['error']}")
+                    return
             
-            excel_path = self.excel_generator.generate_report(df, analysis, str(report_path))
+                # Generate Excel in memory; the disk copy is optional
+                await progress("📝 Generating Excel report...")
+                report_filename = f"analysis_{photo.file_id}.xlsx"
+                report_path = (
+                    str(config.REPORTS_DIR / report_filename) if config.PERSIST_REPORTS else None
+                )
             
-            if not excel_path or not Path(excel_path).exists():
-                await processing_msg.edit_text("❌ Failed to generate Excel report")
-                return
+                excel_buf = await self._run_cpu(
+                    lambda: self.excel_generator.finalize_report(
+                        wb, analysis, report_path, return_bytes=True
+                    )
+                )
             
-            # Send report
-            await processing_msg.edit_text("📤 Sending report...")
+                if excel_buf is None:
+                    await processing_msg.edit_text("❌ Failed to generate Excel report")
+                    return
             
-            with open(excel_path, 'rb') as f:
-                await update.message.reply_document(
-                    document=f,
-                    filename=report_filename,
-                    caption=f"""
+                # Insights travel in the document caption when they fit
+                # (Telegram counts UTF-16 units, so the emoji bullets are
+                # two each); oversized ones go back to a separate message
+                # rather than risking MEDIA_CAPTION_TOO_LONG
+                insights_list = analysis.get('insights', {}).get('insights', ())
+                insights_text = "\n".join(f"• {insight}" for insight in insights_list)
+
+                caption = f"""
 ✅ Analysis Complete!
 
 📊 Data Summary:
 - Rows: {df.shape[0]}
 - Columns: {df.shape[1]}
-
-📈 Key Findings:
 """
+                separate_insights = None
+                if insights_text:
+                    with_insights = f"{caption}\n💡 Insights:\n{insights_text}"
+                    if _utf16_len(with_insights) <= MAX_CAPTION_LENGTH:
+                        caption = with_insights
+                    else:
+                        separate_insights = insights_text
+
+                # Remember the finished report for re-sent photos
+                self._result_cache[file_unique_id] = (
+                    excel_buf.getvalue(), report_filename, caption, separate_insights
                 )
+                while len(self._result_cache) > RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+
+                # Send report straight from memory; reply_document's own
+                # upload indicator makes a "sending" status edit redundant
+                await update.message.reply_document(
+                    document=excel_buf,
+                    filename=report_filename,
+                    caption=caption,
+                )
+                if separate_insights:
+                    await update.message.reply_text(f"💡 Insights:\n{separate_insights}")
             
-            # Add insights
-            insights_text = "\n".join([f"• {insight}" for insight in analysis.get('insights', {}).get('insights', [])])
-            await update.message.reply_text(f"💡 Insights:\n{insights_text}")
-            
-            await processing_msg.delete()
-            self.logger.info(f"Successfully processed image for user {update.effective_user.id}")
+                await processing_msg.delete()
+                self.logger.info(f"Successfully processed image for user {user_id}")
             
         except TelegramError as e:
             self.logger.error(f"Telegram error: {e}")
@@ -160,9 +270,28 @@ Any questions? Just send me an image to get started!
         """Handle errors"""
         self.logger.error(f"Update {update} caused error: {context.error}", exc_info=context.error)
 
+    @staticmethod
+    def _build_request(**kwargs) -> HTTPXRequest:
+        """HTTPX client with a wide connection pool, on HTTP/2 when the h2
+        extra is installed — the 5+ API calls per photo then multiplex
+        over one TLS connection instead of each taking its own"""
+        try:
+            return HTTPXRequest(http_version="2", connection_pool_size=64, **kwargs)
+        except Exception as e:
+            logger.warning(f"HTTP/2 unavailable ({e}), using HTTP/1.1")
+            return HTTPXRequest(connection_pool_size=64, **kwargs)
+
     def get_application(self) -> Application:
         """Create and configure the bot application"""
-        app = Application.builder().token(self.token).build()
+        # Read timeout on the getUpdates client must exceed the long-poll
+        # timeout passed to start_polling below
+        app = (
+            Application.builder()
+            .token(self.token)
+            .request(self._build_request())
+            .get_updates_request(self._build_request(read_timeout=55))
+            .build()
+        )
         
         # Add handlers
         app.add_handler(CommandHandler("start", self.start))
@@ -182,8 +311,23 @@ Any questions? Just send me an image to get started!
 
         async with app:
             await app.start()
-            await app.updater.start_polling()
-            self.logger.info("Bot is polling. Press Ctrl+C to stop.")
+            if config.WEBHOOK_URL:
+                # Webhook mode: Telegram pushes updates to us, so the bot
+                # spends nothing keeping getUpdates connections open
+                await app.updater.start_webhook(
+                    listen="0.0.0.0",
+                    port=config.WEBHOOK_PORT,
+                    url_path=config.WEBHOOK_PATH,
+                    webhook_url=config.WEBHOOK_URL,
+                    secret_token=config.WEBHOOK_SECRET,
+                )
+                self.logger.info(f"Bot is serving webhooks on port {config.WEBHOOK_PORT}.")
+            else:
+                # Hold each getUpdates open for Telegram's ~50s maximum and
+                # re-issue immediately: far fewer HTTP round-trips on an idle
+                # bot, with no latency cost on a busy one
+                await app.updater.start_polling(timeout=50, poll_interval=0.0)
+                self.logger.info("Bot is polling. Press Ctrl+C to stop.")
             # Wait until stop() is called or KeyboardInterrupt
             await self._stop_event.wait()
             await app.updater.stop()
@@ -9,12 +9,14 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-import config
-from src.image_processor import ImageProcessor
 from src.data_analyzer import DataAnalyzer
 from src.excel_generator import ExcelReportGenerator
 
-def test_full_pipeline(image_path):
+# The actual image from Samy's test
+TEST_IMAGE = "/home/predaopenclaw/.openclaw/media/inbound/file_4---376f9706-3cf7-498d-ba5f-bf7caedb2226.jpg"
+
+
+def run_full_pipeline(processor, analyzer, generator, image_path):
     """Test complete pipeline: OCR → Analysis → Excel"""
     print("=" * 80)
     print("TESTING COMPLETE DATA ANALYST PIPELINE")
@@ -22,7 +24,6 @@ def test_full_pipeline(image_path):
     
     # Step 1: OCR Extraction
     print("\n📸 Step 1: Extracting data from image...")
-    processor = ImageProcessor()
     df = processor.extract_data_from_image(image_path)
     
     if df is None or len(df) == 0:
@@ -35,7 +36,6 @@ def test_full_pipeline(image_path):
     
     # Step 2: Data Analysis
     print("\n📊 Step 2: Analyzing data...")
-    analyzer = DataAnalyzer()
     analysis = analyzer.analyze_data(df)
     
     if 'error' in analysis:
@@ -55,9 +55,9 @@ def test_full_pipeline(image_path):
         print(f"  {i}. {insight}")
     
     # Step 3: Excel Generation
+    import config
     print("\n📝 Step 3: Generating Excel report...")
     report_path = config.REPORTS_DIR / "test_analysis.xlsx"
-    generator = ExcelReportGenerator()
     excel_path = generator.generate_report(df, analysis, str(report_path))
     
     if not excel_path or not Path(excel_path).exists():
@@ -79,13 +79,21 @@ def test_full_pipeline(image_path):
     
     return True
 
+def test_full_pipeline(image_processor, analyzer, excel_generator):
+    """Pytest entry point; skipped when the sample image isn't present"""
+    import pytest
+    if not Path(TEST_IMAGE).exists():
+        pytest.skip(f"test image not available: {TEST_IMAGE}")
+    assert run_full_pipeline(image_processor, analyzer, excel_generator, TEST_IMAGE)
+
+
 if __name__ == "__main__":
-    # Test with the actual image from Samy's test
-    test_image = "/home/predaopenclaw/.openclaw/media/inbound/file_4---376f9706-3cf7-498d-ba5f-bf7caedb2226.jpg"
-    
-    if Path(test_image).exists():
-        success = test_full_pipeline(test_image)
+    from src.image_processor import ImageProcessor
+
+    if Path(TEST_IMAGE).exists():
+        success = run_full_pipeline(ImageProcessor(), DataAnalyzer(),
+                                    ExcelReportGenerator(), TEST_IMAGE)
         sys.exit(0 if success else 1)
     else:
-        print(f"Image not found: {test_image}")
+        print(f"Image not found: {TEST_IMAGE}")
         sys.exit(1)